@@ -401,20 +401,73 @@ class _PipelineSchedule(ABC):
         )
 
 
-def _batch_p2p(p2p_ops: List[dist.P2POp], desc: Optional[str] = None):
+def _batch_p2p(
+    p2p_ops: List[dist.P2POp], desc: Optional[str] = None
+) -> List[dist.Work]:
     """
-    Simple wrapper over batch_isend_irecv from torch.distributed, which just adds a descriptive logger on top.
+    Issue a batch of P2P ops and return the list of works to wait on.
+
+    Homogeneous batches (all-sends or all-recvs) are issued as individual
+    `isend`/`irecv` calls rather than through `batch_isend_irecv`, so that NCCL
+    can progress independent transfers concurrently instead of serializing them
+    on a single stream.  Mixed send+recv batches are kept coalesced via
+    `batch_isend_irecv` to avoid deadlocks (e.g. during shape inference).
     """
     if len(p2p_ops) == 0:
-        return None
+        return []
     desc_str = f"{desc}, " if desc else ""
     logger.debug("batch_p2p %s%s", desc_str, p2p_ops)
-    return dist.batch_isend_irecv(p2p_ops).pop()
+
+    op_types = {p2p_op.op for p2p_op in p2p_ops}
+    if op_types == {dist.isend}:
+        return [
+            dist.isend(op.tensor, group=op.group, tag=op.tag, group_dst=op.group_peer)
+            for op in p2p_ops
+        ]
+    if op_types == {dist.irecv}:
+        return [
+            dist.irecv(op.tensor, group=op.group, tag=op.tag, group_src=op.group_peer)
+            for op in p2p_ops
+        ]
+    return dist.batch_isend_irecv(p2p_ops)
+
+
+def _wait_batch_p2p(work: List[dist.Work]):
+    """
+    Waits for a list of dist.Work (typically returned by `_batch_p2p`).
+    """
+    for w in work:
+        w.wait()
+
+
+def _batch_p2p_on_comm_stream(
+    stage: _PipelineStageBase, p2p_ops: List[dist.P2POp], desc: Optional[str] = None
+) -> List[dist.Work]:
+    """
+    Issue P2P ops on the stage's dedicated comm stream when one is configured
+    (opt-in via PYTORCH_PP_COMM_OVERLAP=1), so transfers can overlap with
+    compute on the current stream. Falls back to `_batch_p2p` on the current
+    stream otherwise, and during CUDA graph capture where side streams are not
+    allowed. Consumers still synchronize through `_wait_batch_p2p`, which
+    blocks the current stream on the NCCL work regardless of issuing stream.
+    """
+    comm_stream = stage._comm_stream
+    if comm_stream is None or torch.cuda.is_current_stream_capturing():
+        return _batch_p2p(p2p_ops, desc=desc)
+    comm_stream.wait_stream(torch.cuda.current_stream())
+    with torch.cuda.stream(comm_stream):
+        works = _batch_p2p(p2p_ops, desc=desc)
+    # The send/recv buffers were allocated on the compute stream; mark their
+    # use on the comm stream so the caching allocator does not reuse them
+    # before the transfers complete.
+    for op in p2p_ops:
+        op.tensor.record_stream(comm_stream)
+    return works
 
 
 def _sorted_batch_p2p(
     p2p_ops: List[dist.P2POp], desc: Optional[str] = None
-) -> Dict[int, dist.Work]:
+) -> Dict[int, List[dist.Work]]:
     """
     Sorts the list of P2P ops by the peer rank, and then calls
     batch_isend_irecv. Return a dictionary of works by peer rank. This function
@@ -424,7 +477,7 @@ def _sorted_batch_p2p(
     #   int is the peer rank;
     #   List is the list of ops towards the peer
     ops_by_peer: Dict[int, List[dist.P2POp]] = defaultdict(list)
-    work_by_peer: Dict[int, dist.Work] = {}
+    work_by_peer: Dict[int, List[dist.Work]] = {}
     if len(p2p_ops) == 0:
         return work_by_peer
 
@@ -476,6 +529,13 @@ class PipelineScheduleSingle(_PipelineSchedule):
             self._stage._prepare_backward_infra(self._n_microbatches)
         self._stage_initialized = True
 
+    def clear_runtime_states(self):
+        """
+        Clear the runtime states (input/output chunks, backward state) of the
+        stage owned by this schedule.
+        """
+        self._stage.clear_runtime_states()
+
     def step(self, *args, target=None, losses: Optional[List] = None, **kwargs):
         """
         Run one iteration of the pipeline schedule with *whole-batch* input.
@@ -489,7 +549,7 @@ class PipelineScheduleSingle(_PipelineSchedule):
         """
 
         # Clean per iteration
-        self._stage.clear_runtime_states()
+        self.clear_runtime_states()
 
         # Split inputs into microbatches
         args_split, kwargs_split = self._split_inputs(args, kwargs)
@@ -536,7 +596,7 @@ class _ScheduleForwardOnly(PipelineScheduleSingle):
             self._initialize_stage(arg_mbs[0], kwarg_mbs[0])
 
         # Delay send waits
-        fwd_sends_to_wait: List[dist.Work] = []
+        fwd_sends_to_wait: List[List[dist.Work]] = []
 
         # Run microbatches
         for i in range(self._n_microbatches):
@@ -544,7 +604,7 @@ class _ScheduleForwardOnly(PipelineScheduleSingle):
                 ops = self._stage.get_fwd_recv_ops(i)
                 works = _sorted_batch_p2p(ops, desc="fwd_recv")
                 for work in works.values():
-                    work.wait()
+                    _wait_batch_p2p(work)
 
                 self._stage.forward_one_chunk(i, arg_mbs[i], kwarg_mbs[i])  # type: ignore[index]
 
@@ -558,7 +618,7 @@ class _ScheduleForwardOnly(PipelineScheduleSingle):
         # This should not have performance impact because by the time the first
         # backward arrives all the forward sends should have been finished.
         for work in fwd_sends_to_wait:
-            work.wait()
+            _wait_batch_p2p(work)
 
 
 class ScheduleGPipe(PipelineScheduleSingle):
@@ -587,7 +647,7 @@ class ScheduleGPipe(PipelineScheduleSingle):
             self._initialize_stage(arg_mbs[0], kwarg_mbs[0])
 
         # Delay send waits
-        fwd_sends_to_wait: List[dist.Work] = []
+        fwd_sends_to_wait: List[List[dist.Work]] = []
 
         # Run microbatches
         for i in range(self._n_microbatches):
@@ -595,7 +655,7 @@ class ScheduleGPipe(PipelineScheduleSingle):
                 ops = self._stage.get_fwd_recv_ops(i)
                 works = _sorted_batch_p2p(ops, desc="fwd_recv")
                 for work in works.values():
-                    work.wait()
+                    _wait_batch_p2p(work)
 
                 output = self._stage.forward_one_chunk(i, arg_mbs[i], kwarg_mbs[i])  # type: ignore[index]
 
@@ -611,7 +671,7 @@ class ScheduleGPipe(PipelineScheduleSingle):
         # This should not have performance impact because by the time the first
         # backward arrives all the forward sends should have been finished.
         for work in fwd_sends_to_wait:
-            work.wait()
+            _wait_batch_p2p(work)
 
         # No loss function, no need to run backward
         if not self._has_backward:
@@ -619,13 +679,13 @@ class ScheduleGPipe(PipelineScheduleSingle):
 
         # Run backward
         # Delay send waits
-        bwd_sends_to_wait: List[dist.Work] = []
+        bwd_sends_to_wait: List[List[dist.Work]] = []
         for i in range(self._n_microbatches):
             with record_function(f"Backward {i}"):
                 ops = self._stage.get_bwd_recv_ops(i)
                 works = _sorted_batch_p2p(ops, desc="bwd_recv")
                 for work in works.values():
-                    work.wait()
+                    _wait_batch_p2p(work)
 
                 loss = self._maybe_get_loss(self._stage, i)
                 self._stage.backward_one_chunk(
@@ -643,7 +703,7 @@ class ScheduleGPipe(PipelineScheduleSingle):
 
         # Wait for all backward sends to finish
         for work in bwd_sends_to_wait:
-            work.wait()
+            _wait_batch_p2p(work)
 
 
 class Schedule1F1B(PipelineScheduleSingle):
@@ -689,7 +749,7 @@ class Schedule1F1B(PipelineScheduleSingle):
             # Receive activations
             fwd_recvs = self._stage.get_fwd_recv_ops(fwd_mb_index)
             if recv_work := _batch_p2p(fwd_recvs, desc="fwd_recv"):
-                recv_work.wait()
+                _wait_batch_p2p(recv_work)
 
             # Compute
             output = self._stage.forward_one_chunk(fwd_mb_index, arg_mbs[fwd_mb_index], kwarg_mbs[fwd_mb_index])  # type: ignore[index]
@@ -699,7 +759,7 @@ class Schedule1F1B(PipelineScheduleSingle):
             # case it doesn't create a lot of benefit to compute next chunk
             # eagerly either)
             if send_work:
-                send_work.wait()
+                _wait_batch_p2p(send_work)
 
             # Send activations
             fwd_sends = self._stage.get_fwd_send_ops(fwd_mb_index)
@@ -722,7 +782,7 @@ class Schedule1F1B(PipelineScheduleSingle):
 
             # Now, we need to fire the fwd_sends and bwd_recvs together
             if fuse_work := _batch_p2p(fwd_sends + bwd_recvs, desc="fwd_send_bwd_recv"):
-                fuse_work.wait()
+                _wait_batch_p2p(fuse_work)
 
             # Backward one chunk
             loss = self._maybe_get_loss(self._stage, bwd_mb_index)
@@ -745,7 +805,7 @@ class Schedule1F1B(PipelineScheduleSingle):
 
             # Fuse it with bwd_sends above
             if fuse_work := _batch_p2p(bwd_sends + fwd_recvs, desc="bwd_send_fwd_recv"):
-                fuse_work.wait()
+                _wait_batch_p2p(fuse_work)
 
             # Now do the fwd
             output = self._stage.forward_one_chunk(fwd_mb_index, arg_mbs[fwd_mb_index], kwarg_mbs[fwd_mb_index])  # type: ignore[index]
@@ -765,7 +825,7 @@ class Schedule1F1B(PipelineScheduleSingle):
             # prepare bwd recv ops
             bwd_recvs = self._stage.get_bwd_recv_ops(bwd_mb_index)
             if recv_work := _batch_p2p(bwd_recvs, desc="bwd_recv"):
-                recv_work.wait()
+                _wait_batch_p2p(recv_work)
 
             # Backward one chunk
             loss = self._maybe_get_loss(self._stage, bwd_mb_index)
@@ -777,7 +837,7 @@ class Schedule1F1B(PipelineScheduleSingle):
 
             # Clear previous chunk's backward sends (hopefully they have well finished)
             if send_work:
-                send_work.wait()
+                _wait_batch_p2p(send_work)
 
             # Get the bwd send ops, fire it
             bwd_sends = self._stage.get_bwd_send_ops(bwd_mb_index)
@@ -786,7 +846,7 @@ class Schedule1F1B(PipelineScheduleSingle):
 
         # Wait for the last backward send to finish
         if send_work:
-            send_work.wait()
+            _wait_batch_p2p(send_work)
 
         # Return losses if there is a container passed in
         self._update_losses(self._stage, losses)
@@ -1141,24 +1201,40 @@ class PipelineScheduleMulti(_PipelineSchedule):
                 stage._prepare_backward_infra(self._n_microbatches)
         self._stages_initialized = True
 
-    def _dump_csv(self, filename):
-        """Dump a CSV representation of the schedule into a file with the provided filename."""
-        with open(filename, "w", newline="") as csvfile:
-            writer = csv.writer(csvfile)
+    def clear_runtime_states(self):
+        """
+        Clear the runtime states (input/output chunks, backward state) of all
+        stages owned by this schedule.
+        """
+        for stage in self._stages:
+            stage.clear_runtime_states()
+
+    def _dump_csv(self, path_or_file):
+        """Dump a CSV representation of the schedule into the provided file name
+        or file-like object (e.g. an io.StringIO, avoiding filesystem I/O)."""
+        if hasattr(path_or_file, "write"):
+            writer = csv.writer(path_or_file)
             for rank in self.pipeline_order:
                 writer.writerow(self.pipeline_order[rank])
+        else:
+            with open(path_or_file, "w", newline="") as csvfile:
+                self._dump_csv(csvfile)
 
-    def _load_csv(self, filename, format="compute_only"):
-        """Load a CSV representation of the schedule from a file with the provided filename.
+    def _load_csv(self, path_or_file, format="compute_only"):
+        """Load a CSV representation of the schedule from the provided file name
+        or file-like object.
         This API will most likely get renamed/refactored so is marked as internal for now.
 
         format must be "compute_only" for PipelineScheduleMulti
         """
         assert format == "compute_only"
-        with open(filename, newline="") as csvfile:
-            reader = csv.reader(csvfile)
-            for rank, row in enumerate(reader):
-                self.pipeline_order[rank] = [_Action.from_str(s) for s in row]
+        if hasattr(path_or_file, "read"):
+            rows = list(csv.reader(path_or_file))
+        else:
+            with open(path_or_file, newline="") as csvfile:
+                rows = list(csv.reader(csvfile))
+        for rank, row in enumerate(rows):
+            self.pipeline_order[rank] = [_Action.from_str(s) for s in row]
         _validate_schedule(
             self.pipeline_order,
             self.pp_group_size,
@@ -1178,8 +1254,7 @@ class PipelineScheduleMulti(_PipelineSchedule):
         losses: a list to store the losses for each microbatch.
         """
         # Clean per iteration
-        for stage in self._stages:
-            stage.clear_runtime_states()
+        self.clear_runtime_states()
 
         # Split inputs into microbatches
         args_split, kwargs_split = self._split_inputs(args, kwargs)
@@ -1353,7 +1428,7 @@ class PipelineScheduleMulti(_PipelineSchedule):
 
                 # do the communication
                 if ops:
-                    _batch_p2p(ops).wait()
+                    _wait_batch_p2p(_batch_p2p(ops))
             except Exception as e:
                 logger.error(
                     "[Rank %s] pipeline schedule %s caught the following exception \
@@ -1417,38 +1492,46 @@ class _PipelineScheduleRuntime(PipelineScheduleMulti):
         else:
             raise NotImplementedError(f"{format=} is not implemented")
 
-    def _load_csv(self, filename: str, format: str = "compute_only"):
+    def _load_csv(self, path_or_file, format: str = "compute_only"):
         """Loads a csv in simple format and then lowers it to include comunication actions
 
+        The csv can be given as a file name or a file-like object.
         format must be either "compute_only" or "compute_comms".  If compute_only, the lowering passes
         will automatically be run to generate a compute_comms schedule.
         """
         if format == "compute_only":
             # this will populate self.pipeline_order
-            super()._load_csv(filename)
+            super()._load_csv(path_or_file)
             # this will populate self.pipeline_order_with_comms
             self._load_actions(self.pipeline_order)
         elif format == "compute_comms":
+            if hasattr(path_or_file, "read"):
+                rows = list(csv.reader(path_or_file))
+            else:
+                with open(path_or_file, newline="") as csvfile:
+                    rows = list(csv.reader(csvfile))
             actions = {}
-            with open(filename, newline="") as csvfile:
-                reader = csv.reader(csvfile)
-                for rank, row in enumerate(reader):
-                    actions[rank] = [_Action.from_str(s) for s in row]
-                self._load_actions(actions, format=format)
+            for rank, row in enumerate(rows):
+                actions[rank] = [_Action.from_str(s) for s in row]
+            self._load_actions(actions, format=format)
         else:
             raise NotImplementedError(f"{format=} is not implemented")
 
-    def _dump_csv(self, filename: str):
-        """Dump a CSV representation of the compute + comms schedule into a file with the provided filename."""
+    def _dump_csv(self, path_or_file):
+        """Dump a CSV representation of the compute + comms schedule into the provided
+        file name or file-like object."""
         # TODO should there be an option to dump the compute_only schedule from PipelineScheduleRuntime? It's possible
         # that it does not exist if it was created from a compute_comms schedule.
         assert (
             self.pipeline_order_with_comms is not None
         ), "Must initialize compute_comms schedule before dump_csv"
-        with open(filename, "w", newline="") as csvfile:
-            writer = csv.writer(csvfile)
+        if hasattr(path_or_file, "write"):
+            writer = csv.writer(path_or_file)
             for rank in self.pipeline_order_with_comms:
                 writer.writerow(self.pipeline_order_with_comms[rank])
+        else:
+            with open(path_or_file, "w", newline="") as csvfile:
+                self._dump_csv(csvfile)
 
     def _simulate(self):
         return _simulate_comms_compute(
@@ -1485,11 +1568,11 @@ class _PipelineScheduleRuntime(PipelineScheduleMulti):
         ), "Must call _load_actions() before calling _step_microbatches()"
 
         # recv ops indexed by (stage_idx, mb_idx) need to be waited on before use
-        bwd_recv_ops: Dict[Tuple[int, int], Work] = {}
-        fwd_recv_ops: Dict[Tuple[int, int], Work] = {}
+        bwd_recv_ops: Dict[Tuple[int, int], List[Work]] = {}
+        fwd_recv_ops: Dict[Tuple[int, int], List[Work]] = {}
 
         # send ops should be waited on before step() exists, mainly for hygeine
-        send_ops: List[Work] = []
+        send_ops: List[List[Work]] = []
 
         # we track which stages are 'active' when used with FSDP, and wait on unshard ops before computing on stages
         unshard_ops: Dict[int, UnshardHandle] = {}
@@ -1538,24 +1621,32 @@ class _PipelineScheduleRuntime(PipelineScheduleMulti):
                 # However, I was wondering if I should avoid calling batched operators at all in the case that there is
                 # only one operator per batch.  I could iterate through the 'fwd_send_ops' one by one and run them.
                 if comp_type == SEND_F:
-                    send_ops.append(_batch_p2p(stage.get_fwd_send_ops(mb_index)))
+                    send_ops.append(
+                        _batch_p2p_on_comm_stream(
+                            stage, stage.get_fwd_send_ops(mb_index)
+                        )
+                    )
                 elif comp_type == SEND_B:
-                    send_ops.append(_batch_p2p(stage.get_bwd_send_ops(mb_index)))
+                    send_ops.append(
+                        _batch_p2p_on_comm_stream(
+                            stage, stage.get_bwd_send_ops(mb_index)
+                        )
+                    )
                 elif comp_type == RECV_F:
                     assert (
                         stage_idx,
                         mb_index,
                     ) not in fwd_recv_ops, "Recv twice for {stage_idx=} {mb_index=} without executing forward"
-                    fwd_recv_ops[(stage_idx, mb_index)] = _batch_p2p(
-                        stage.get_fwd_recv_ops(mb_index)
+                    fwd_recv_ops[(stage_idx, mb_index)] = _batch_p2p_on_comm_stream(
+                        stage, stage.get_fwd_recv_ops(mb_index)
                     )
                 elif comp_type == RECV_B:
                     assert (
                         stage_idx,
                         mb_index,
                     ) not in bwd_recv_ops, "Recv twice for {stage_idx=} {mb_index=} without executing backward"
-                    bwd_recv_ops[(stage_idx, mb_index)] = _batch_p2p(
-                        stage.get_bwd_recv_ops(mb_index)
+                    bwd_recv_ops[(stage_idx, mb_index)] = _batch_p2p_on_comm_stream(
+                        stage, stage.get_bwd_recv_ops(mb_index)
                     )
                 elif comp_type == UNSHARD:
                     if stage_uses_fsdp:
@@ -1586,7 +1677,7 @@ class _PipelineScheduleRuntime(PipelineScheduleMulti):
                             stage_idx,
                             mb_index,
                         ) in fwd_recv_ops, f"Computing {action=} before receiving input"
-                        fwd_recv_ops.pop((stage_idx, mb_index)).wait()
+                        _wait_batch_p2p(fwd_recv_ops.pop((stage_idx, mb_index)))
 
                     output = stage.forward_one_chunk(
                         mb_index, arg_mbs[mb_index], kwarg_mbs[mb_index]
@@ -1615,7 +1706,7 @@ class _PipelineScheduleRuntime(PipelineScheduleMulti):
                         ) in bwd_recv_ops, (
                             f"Attempted to run compute {action=} before receiving input"
                         )
-                        bwd_recv_ops.pop((stage_idx, mb_index)).wait()
+                        _wait_batch_p2p(bwd_recv_ops.pop((stage_idx, mb_index)))
                     loss = self._maybe_get_loss(stage, mb_index)
                     backward_counter[stage_idx] += 1
                     stage.backward_one_chunk(
@@ -1642,7 +1733,7 @@ class _PipelineScheduleRuntime(PipelineScheduleMulti):
                         ) in bwd_recv_ops, (
                             f"Attempted to run compute {action=} before receiving input"
                         )
-                        bwd_recv_ops.pop((stage_idx, mb_index)).wait()
+                        _wait_batch_p2p(bwd_recv_ops.pop((stage_idx, mb_index)))
                     loss = self._maybe_get_loss(stage, mb_index)
                     stage.backward_one_chunk(
                         mb_index,
@@ -1680,7 +1771,7 @@ class _PipelineScheduleRuntime(PipelineScheduleMulti):
 
         # Mostly these operations should have finished long ago, but there isn't an obvious time when to wait for them
         while len(send_ops):
-            send_ops.pop().wait()
+            _wait_batch_p2p(send_ops.pop())
 
         assert len(unshard_ops) == 0, "Unused unshard operations"
 
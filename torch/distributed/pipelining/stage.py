@@ -2,6 +2,7 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates
 import logging
 import operator
+import os
 from abc import ABC, abstractmethod
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
@@ -27,6 +28,10 @@ __all__ = [
 
 logger = logging.getLogger(__name__)
 
+# Opt-in: give each stage a dedicated CUDA stream for P2P communication so
+# NCCL send/recv can overlap with microbatch compute on the default stream.
+_COMM_OVERLAP = os.getenv("PYTORCH_PP_COMM_OVERLAP", "0") == "1"
+
 
 def _normalize_model_output_as_tuple(output: Any) -> Tuple[Any]:
     """[Note: pipeline model output type]
@@ -196,6 +201,14 @@ class _PipelineStageBase(ABC):
         self.grad_recv_info: Dict = {}
         self.grad_send_info: Optional[List] = None
 
+        # Dedicated stream for P2P communication (opt-in via
+        # PYTORCH_PP_COMM_OVERLAP=1). When present, the schedule runtime
+        # issues this stage's NCCL send/recv on it instead of the compute
+        # stream, hiding transfer latency under microbatch compute.
+        self._comm_stream: Optional[torch.cuda.Stream] = None
+        if _COMM_OVERLAP and self.device.type == "cuda":
+            self._comm_stream = torch.cuda.Stream(device=self.device)
+
         # To be populated later by the Schedule
         self.chunks: Optional[int] = None
         self.stage_index_to_group_rank: Dict[int, int] = {